@@ -10,3 +10,10 @@ def quick_load(*args, **kwargs):
     warnings.warn('The quick-loader is now the default behavior. The -q and --quick flags will be removed soon.', stacklevel=2)
     return load(*args, **kwargs)
 
+def __getattr__(name):
+    # progen pulls in scipy.stats and joblib, so only import it on first use
+    # (e.g. caesar.progen.run_progen) rather than on every `import caesar`
+    if name == 'progen':
+        import importlib
+        return importlib.import_module('caesar.progen')
+    raise AttributeError("module 'caesar' has no attribute '%s'" % name)
@@ -5,7 +5,7 @@ import yt
 from yt.funcs import mylog
 
 import caesar
-from caesar.progen import progen_finder
+from caesar.__version__ import VERSION
 
 class Snapshot(object):
     """Class for tracking paths and data for simulation snapshots.
@@ -35,16 +35,28 @@ class Snapshot(object):
         self.snapnum  = snapnum
         self.snap     = '%s/%s%03d.%s' % (snapdir, snapname, snapnum, extension)
 
-    def set_output_information(self, ds, prefix='caesar_', suffix='hdf5'):
-        """Set the name of the CAESAR output file."""
-        if ds.cosmological_simulation == 0:
-            time = 't%0.3f' % ds.current_time
+    def set_output_information(self, ds=None, prefix='caesar_', suffix='hdf5'):
+        """Set the name of the CAESAR output file.
+
+        The name only depends on the snapshot path, so ``ds`` is
+        optional; if supplied its ``fullpath`` is used.
+        """
+        if ds is None:
+            fullpath = os.path.abspath(os.path.expanduser(os.path.dirname(self.snap)))
         else:
-            time = 'z%0.3f' % ds.current_redshift
-                
-        self.outdir   = '%s/Groups' % ds.fullpath
+            fullpath = ds.fullpath
+
+        self.outdir   = '%s/Groups' % fullpath
         self.outfile  = '%s/%s%s%03d.%s' % (self.outdir, prefix, self.snapname.replace('snap_',''), self.snapnum,suffix)
 
+    def locate_existing_outfile(self):
+        """Return the path of an existing CAESAR output for this
+        snapshot, or None.  Does not open the snapshot."""
+        self.set_output_information()
+        if os.path.isfile(self.outfile):
+            return self.outfile
+        return None
+
     def _make_output_dir(self):
         """If output directory is not present, create it."""
         if not os.path.isdir(self.outdir):
@@ -53,19 +65,32 @@ class Snapshot(object):
             except:
                 pass
             
-    def member_search(self, skipran, **kwargs):
-        """Perform the member_search() method on this snapshot."""
+    def load(self, skipran):
+        """Load this snapshot, or return None if it is missing or
+        (with ``skipran``) has already been processed."""
+        # cheap check first: no need to open the snapshot if it was already run
+        if skipran and self.locate_existing_outfile() is not None:
+            mylog.warning('%s FOUND, skipping' % self.outfile)
+            return None
+
         if not os.path.isfile(self.snap):
             mylog.warning('%s NOT found, skipping' % self.snap)
-            return
-        
-        ds = yt.load(self.snap)
-        self.set_output_information(ds)
+            return None
 
-        if os.path.isfile(self.outfile) and skipran:
-            mylog.warning('%s FOUND, skipping' % self.outfile)
-            return
+        return yt.load(self.snap)
+
+    def member_search(self, skipran, ds=None, **kwargs):
+        """Perform the member_search() method on this snapshot.
 
+        ``ds`` may be passed in if the snapshot was already loaded via
+        :meth:`load`.
+        """
+        if ds is None:
+            ds = self.load(skipran)
+            if ds is None:
+                return
+
+        self.set_output_information(ds)
         self._make_output_dir()
 
         obj = caesar.CAESAR(ds)
@@ -77,7 +102,6 @@ class Snapshot(object):
 
 def print_art():
     """Print some ascii art."""
-    from caesar.__version__ import VERSION
     copywrite = '    (C) 2016 Robert Thompson'
     version   = '    Version %s' % VERSION
 
@@ -211,8 +235,16 @@ def drive(snapdirs, snapname, snapnums, progen=False, skipran=False,
         for snap in rank_snaps:
             snap.member_search(skipran, **kwargs)
 
+    # progen needs every rank's outputs on disk
+    if using_mpi:
+        comm.Barrier()
+
     if progen:
-        caesar.progen.run_progen(snapdirs, snapname, snapnums, prefix=caesar_prefix, suffix=extension, **kwargs)
+        # imported here: progen pulls in scipy.stats and joblib, which every
+        # rank would otherwise pay for on `import caesar`
+        from caesar.progen import run_progen
+        run_progen(snapdirs, snapname, snapnums, prefix=caesar_prefix, suffix=extension,
+                   comm=comm if using_mpi else None, **kwargs)
 
 if __name__ == '__main__':
     print_art()
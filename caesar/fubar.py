@@ -6,7 +6,6 @@ from caesar.property_manager import ptype_ints
 from caesar.utils import calculate_local_densities
 from caesar.fof6d import run_fof_6d
 
-import six
 from yt.funcs import mylog
 from yt.extern.tqdm import tqdm
 from yt.utilities.lib.contour_finding import ParticleContourTree
@@ -542,13 +541,15 @@ def fubar(obj, group_type, **kwargs):
         return
     
     tags = fof_tags
-        
-    nparts = len(tags)
-    for i in range(0,nparts):
-        index = tag_sort[i]
-        tag   = tags[index]
-        if tag < 0: continue
-        groupings[tag]._append_global_index(index)
+
+    # tag_sort leaves each group's particles in one contiguous run, so hand
+    # every group its run as a single array instead of appending per particle
+    sorted_tags = tags[tag_sort]
+    group_start = np.searchsorted(sorted_tags, unique_groupIDs, side='left')
+    group_end   = np.searchsorted(sorted_tags, unique_groupIDs, side='right')
+    for GroupID, i0, i1 in zip(unique_groupIDs, group_start, group_end):
+        if GroupID < 0: continue
+        groupings[GroupID].global_indexes = tag_sort[i0:i1].astype(np.int64)
 
     if unbind: mylog.info('Unbinding %s' % group_types[group_type])
 
@@ -559,7 +560,7 @@ def fubar(obj, group_type, **kwargs):
 
     n_invalid = 0
     group_list = []
-    for v in six.itervalues(groupings):
+    for v in groupings.values():
         if not v._valid:
             n_invalid += 1
             continue
@@ -6,7 +6,6 @@ from caesar.property_manager import ptype_ints
 from caesar.utils import calculate_local_densities
 from caesar.fof6d import run_fof_6d
 
-import six
 from yt.funcs import mylog
 from yt.extern.tqdm import tqdm
 from yt.units.yt_array import uconcatenate, YTArray
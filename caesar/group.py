@@ -1,4 +1,3 @@
-import six
 import numpy as np
 
 from caesar.property_manager import ptype_ints
@@ -55,14 +54,16 @@ class GroupList(object):
     """Class to hold particle/field index lists."""
     def __init__(self, name):
         self.name = name
+        self._priv = '_%s' % name
     def __get__(self, instance, owner):
-        if not hasattr(instance, '_%s' % self.name) or \
-           isinstance(getattr(instance, '_%s' % self.name), int):
+        val = instance.__dict__.get(self._priv)
+        if val is None or isinstance(val, int):
             from caesar.loader import restore_single_list
             restore_single_list(instance.obj, instance, self.name)
-        return getattr(instance, '_%s' % self.name)
+            val = instance.__dict__[self._priv]
+        return val
     def __set__(self, instance, value):
-        setattr(instance, '_%s' % self.name, value)
+        instance.__dict__[self._priv] = value
 
 
 class Group(object):
@@ -85,10 +86,7 @@ class Group(object):
         self.velocity_dispersions = {}
         self.rotation = {}
         self.virial_quantities = {}
-    def _append_global_index(self, i):
-        if not hasattr(self, 'global_indexes'):
-            self.global_indexes = []
-        self.global_indexes.append(i)
+        self.global_indexes = np.empty(0, dtype=np.int64)
 
     @property
     def _valid(self):
@@ -103,6 +101,18 @@ class Group(object):
         else:
             return True
 
+    def _unit_factor(self, quantity, units):
+        """Scalar factor converting ``obj.units[quantity]`` to ``units``.
+        Cached on ``obj.simulation`` so it is only computed once, rather
+        than converting whole particle arrays for every group."""
+        sim = self.obj.simulation
+        if not hasattr(sim, '_unit_factors'):
+            sim._unit_factors = {}
+        key = (quantity, units)
+        if key not in sim._unit_factors:
+            sim._unit_factors[key] = float(self.obj.yt_dataset.quan(1.0, self.obj.units[quantity]).to(units).d)
+        return sim._unit_factors[key]
+
     def _delete_attribute(self,a):
         """Helper method to delete an attribute if present."""
         if hasattr(self,a):
@@ -126,12 +136,12 @@ class Group(object):
     def _cleanup(self):
         """ cleanup function to delete attributes no longer needed """
         self._delete_attribute('global_indexes')
-        self._delete_attribute('__glist')
+        self._delete_attribute('_is_gas')
         self._remove_dm_references()
         """ cleanup function to delete attributes no longer needed """
         self._delete_attribute('periodic_r')
-        self._delete_attribute('__slist')
-        self._delete_attribute('__dmlist')
+        self._delete_attribute('_is_star')
+        self._delete_attribute('_is_dm')
 
 
     def _process_group(self):
@@ -167,17 +177,17 @@ class Group(object):
         ptypes  = self.obj.data_manager.ptype[self.global_indexes]
         indexes = self.obj.data_manager.indexes[self.global_indexes]
 
-        # lists for the concatinated global list
-        self.__glist = np.where(ptypes == ptype_ints['gas'])[0]
-        self.__slist = np.where(ptypes == ptype_ints['star'])[0]
-        self.__dmlist = np.where(ptypes == ptype_ints['dm'])[0]
+        # masks over the concatinated global list, reused by the _calculate_* methods
+        self._is_gas  = ptypes == ptype_ints['gas']
+        self._is_star = ptypes == ptype_ints['star']
+        self._is_dm   = ptypes == ptype_ints['dm']
 
         # individual global lists
-        self.glist  = indexes[np.where(ptypes == ptype_ints['gas'])[0]]
-        self.slist  = indexes[np.where(ptypes == ptype_ints['star'])[0]]
-        self.dmlist = indexes[np.where(ptypes == ptype_ints['dm'])[0]]
-        self.bhlist = indexes[np.where(ptypes == ptype_ints['bh'])[0]]
-        self.dlist  = indexes[np.where(ptypes == ptype_ints['dust'])[0]]
+        self.glist  = indexes[self._is_gas]
+        self.slist  = indexes[self._is_star]
+        self.dmlist = indexes[self._is_dm]
+        self.bhlist = indexes[ptypes == ptype_ints['bh']]
+        self.dlist  = indexes[ptypes == ptype_ints['dust']]
         
         self.ngas  = len(self.glist)
         self.nstar = len(self.slist)
@@ -185,7 +195,6 @@ class Group(object):
         self.ndust = len(self.dlist)
 
         if self.obj.data_manager.blackholes:
-            self.bhlist = indexes[np.where(ptypes == ptype_ints['bh'])[0]]
             self.nbh    = len(self.bhlist)
 
     def _calculate_total_mass(self):
@@ -194,16 +203,17 @@ class Group(object):
         
     def _calculate_masses(self):
         """Calculate various total masses."""
-        mass_dm     = np.sum(self.obj.data_manager.mass[self.obj.data_manager.dmlist[self.dmlist]])
-        mass_gas    = np.sum(self.obj.data_manager.mass[self.obj.data_manager.glist[self.glist]])
-        mass_star   = np.sum(self.obj.data_manager.mass[self.obj.data_manager.slist[self.slist]])
+        mass        = self.obj.data_manager.mass[self.global_indexes]
+        mass_dm     = np.sum(mass[self._is_dm])
+        mass_gas    = np.sum(mass[self._is_gas])
+        mass_star   = np.sum(mass[self._is_star])
         mass_baryon = mass_gas + mass_star
 
         self.masses['dm']      = self.obj.yt_dataset.quan(mass_dm, self.obj.units['mass'])
         self.masses['gas']     = self.obj.yt_dataset.quan(mass_gas, self.obj.units['mass'])
         self.masses['stellar'] = self.obj.yt_dataset.quan(mass_star, self.obj.units['mass'])
         self.masses['baryon']  = self.obj.yt_dataset.quan(mass_baryon, self.obj.units['mass'])
-        self.masses['H']       = self.masses['gas'] * self.obj.simulation.XH
+        self.masses['H']       = self.obj.yt_dataset.quan(mass_gas * self.obj.simulation.XH, self.obj.units['mass'])
 
 
         if self.obj.simulation.nbh > 0:
@@ -238,37 +248,39 @@ class Group(object):
 
     def _calculate_center_of_mass_quantities(self):
         """Calculate center-of-mass position and velocity.  From caesar_mika """
-        def get_center_of_mass_quantity(quantity):  ## REFACTOR ME TO BE MORE GENERIC WITH SHAPE
-            val  = np.zeros(3)
-            for i in range(0,3):
-                quantity_arr = getattr(self.obj.data_manager, quantity)[self.global_indexes, i]
-                weights      = self.obj.data_manager.mass[self.global_indexes]
-                if (quantity=='pos'):# We need to be consistent with periodic boundaries
-                    if (quantity_arr.max() - quantity_arr.min())>0.5*self.obj.simulation.boxsize.d:
-                        theta_i          = 6.283185307179586*quantity_arr/self.obj.simulation.boxsize.d #(2pi)
-                        Zeta_i           = np.cos(theta_i)
-                        Xhi_i            = np.sin(theta_i)
-                        Theta            = np.arctan2(-np.average(Xhi_i, weights=weights), -np.average(Zeta_i, weights=weights))+3.141592653589793
-                        val[i]           = self.obj.simulation.boxsize.d*Theta/6.283185307179586
-                    else: val[i]  = np.average(quantity_arr, weights=weights)
-                else: val[i]  = np.average(quantity_arr, weights=weights)
+        def get_center_of_mass_quantity(quantity):
+            quantity_arr = getattr(self.obj.data_manager, quantity)[self.global_indexes]
+            weights      = self.obj.data_manager.mass[self.global_indexes]
+            # single pass over all three axes: sum_i m_i * x_ij
+            val  = np.einsum('i,ij->j', weights, quantity_arr) / self.masses['total'].d
+            if (quantity=='pos'):# We need to be consistent with periodic boundaries
+                boxsize = self.obj.simulation.boxsize.d
+                wrapped = np.ptp(quantity_arr, axis=0) > 0.5*boxsize
+                if wrapped.any():
+                    theta_i = 6.283185307179586*quantity_arr[:,wrapped]/boxsize #(2pi)
+                    Zeta_i  = np.einsum('i,ij->j', weights, np.cos(theta_i))
+                    Xhi_i   = np.einsum('i,ij->j', weights, np.sin(theta_i))
+                    # arctan2 is invariant under the (positive) 1/sum(weights) normalisation
+                    Theta   = np.arctan2(-Xhi_i, -Zeta_i)+3.141592653589793
+                    val[wrapped] = boxsize*Theta/6.283185307179586
             return val
 
+        from caesar.group_funcs import get_periodic_r
+
         self.pos = self.obj.yt_dataset.arr(get_center_of_mass_quantity('pos'), self.obj.units['length'])
         self.vel = self.obj.yt_dataset.arr(get_center_of_mass_quantity('vel'), self.obj.units['velocity'])
-        cmpos = (self.pos.to('kpc')).d
-        ppos  = self.obj.yt_dataset.arr(self.obj.data_manager.pos[self.global_indexes], self.obj.units['length'])
-        ppos  = (ppos.to('kpc')).d
+        kpc_per_length = self._unit_factor('length', 'kpc')
+        pos  = self.obj.data_manager.pos[self.global_indexes]
+        ppos = np.multiply(pos, kpc_per_length, dtype=np.float64)
 
         #Minimum potential position
         pot = self.obj.data_manager.pot[self.global_indexes]
-        pos = self.obj.data_manager.pos[self.global_indexes]
         self.minpotpos = self.obj.yt_dataset.arr(pos[np.argmin(pot)], self.obj.units['length'])
 
         #Compute distances from the center of mass or minimum potential?
         self.periodic_r = np.empty(len(ppos), dtype=np.float64)
-        #get_periodic_r(self.obj.simulation.boxsize.to('kpc').d, cmpos, ppos, self.periodic_r) # COM
-        get_periodic_r(self.obj.simulation.boxsize.to('kpc').d, self.minpotpos.to('kpc').d, ppos, self.periodic_r) # minimum potential
+        #get_periodic_r(self.obj.simulation.boxsize.d * kpc_per_length, self.pos.d * kpc_per_length, ppos, self.periodic_r) # COM
+        get_periodic_r(self.obj.simulation.boxsize.d * kpc_per_length, self.minpotpos.d * kpc_per_length, ppos, self.periodic_r) # minimum potential
         #Put the periodic_r for further use and not to compute it everytime
         self.periodic_r = self.obj.yt_dataset.arr(self.periodic_r, 'kpc')
 
@@ -291,51 +303,86 @@ class Group(object):
                        group_types[self.obj_type]):
             return
 
+        from caesar.group_funcs import get_unbound
+
         if not hasattr(self, 'unbound_indexes'):
+            # preallocated per-ptype buffers, filled up to _unbound_n and
+            # trimmed before returning
+            nbuf = max(64, len(self.global_indexes) // 16)
             self.unbound_indexes = {
-                ptype_ints['gas']:[],
-                ptype_ints['star']:[],
-                ptype_ints['dm']:[],
-                ptype_ints['bh']:[],
-                ptype_ints['dust']:[],
+                ptype_ints['gas']:np.empty(nbuf, dtype=np.int64),
+                ptype_ints['star']:np.empty(nbuf, dtype=np.int64),
+                ptype_ints['dm']:np.empty(nbuf, dtype=np.int64),
+                ptype_ints['bh']:np.empty(nbuf, dtype=np.int64),
+                ptype_ints['dust']:np.empty(nbuf, dtype=np.int64),
             }
+            self._unbound_n = dict.fromkeys(self.unbound_indexes, 0)
+        if not hasattr(self, '_unbound_n'):
+            # trimmed by an earlier call; keep appending after those entries
+            self._unbound_n = {ptype: len(unbound) for ptype, unbound in self.unbound_indexes.items()}
         if not hasattr(self, 'unbind_iterations'):
-            self.unbind_iterations = 0        
-        self.unbind_iterations += 1
-        
-        cmpos = (self.pos.to('kpc')).d
-        ppos  = self.obj.yt_dataset.arr(self.obj.data_manager.pos[self.global_indexes], self.obj.units['length'])
-        ppos  = (ppos.to('kpc')).d
-        cmvel = (self.vel.to('kpc/s')).d
-        pvels = self.obj.yt_dataset.arr(self.obj.data_manager.vel[self.global_indexes], self.obj.units['velocity'])
-        pvels = (pvels.to('kpc/s')).d
-        mass  = self.obj.yt_dataset.arr(self.obj.data_manager.mass[self.global_indexes], self.obj.units['mass'])
-        mass  = (mass.to('Msun')).d
-
-        init_mass = (self.masses['total'].to('Msun')).d
-
-        r = np.empty(len(ppos), dtype=np.float64)
-        get_periodic_r(self.obj.simulation.boxsize.d, cmpos, ppos, r)
-
-        v2 = ( (pvels[:,0] - cmvel[0])**2 +
-               (pvels[:,1] - cmvel[1])**2 +
-               (pvels[:,2] - cmvel[2])**2 )
-        
-        energy = -(mass * self.obj.simulation.G.d * (init_mass - mass) / r) + (0.5 * mass * v2)
-
-        positive = np.where(energy > 0)[0]
-        if len(positive) > 0:
-            positive = positive[::-1]
-            for i in positive:
-                global_index = self.global_indexes[i]
-                self.unbound_indexes[self.obj.data_manager.ptype[global_index]].append(self.obj.data_manager.index[global_index])
-                del self.global_indexes[i]
-
-            self._assign_local_data()                        
-            if not self._valid: return            
+            self.unbind_iterations = 0
+
+        kpc_per_length  = self._unit_factor('length', 'kpc')
+        kpcs_per_vel    = self._unit_factor('velocity', 'kpc/s')
+        Msun_per_mass   = self._unit_factor('mass', 'Msun')
+        boxsize         = self.obj.simulation.boxsize.d * kpc_per_length
+
+        # gather and convert this group's particles once; each pass below
+        # only compacts these local arrays
+        ppos  = np.multiply(self.obj.data_manager.pos[self.global_indexes],  kpc_per_length, dtype=np.float64)
+        pvels = np.multiply(self.obj.data_manager.vel[self.global_indexes],  kpcs_per_vel,   dtype=np.float64)
+        mass  = np.multiply(self.obj.data_manager.mass[self.global_indexes], Msun_per_mass,  dtype=np.float64)
+
+        while True:
+            self.unbind_iterations += 1
+
+            cmpos = self.pos.d * kpc_per_length
+            cmvel = self.vel.d * kpcs_per_vel
+            init_mass = self.masses['total'].d * Msun_per_mass
+
+            unbound = np.empty(len(ppos), dtype=np.uint8)
+            get_unbound(boxsize, self.obj.simulation.G.d, init_mass,
+                        cmpos, cmvel, ppos, pvels, mass, unbound)
+
+            positive = np.flatnonzero(unbound)
+            if not len(positive):
+                break
+
+            removed_global = self.global_indexes[positive]
+            removed_ptype  = self.obj.data_manager.ptype[removed_global]
+            removed_index  = self.obj.data_manager.indexes[removed_global]
+            for ptype in self.unbound_indexes:
+                self._append_unbound(ptype, removed_index[removed_ptype == ptype])
+
+            # drop the unbound particles in a single compaction
+            bound = np.ones(len(self.global_indexes), dtype=bool)
+            bound[positive] = False
+            self.global_indexes = self.global_indexes[bound]
+            ppos  = ppos[bound]
+            pvels = pvels[bound]
+            mass  = mass[bound]
+
+            self._assign_local_data()
+            if not self._valid: break
             self._calculate_total_mass()
             self._calculate_center_of_mass_quantities()
-            self._unbind()
+
+        for ptype, n in self._unbound_n.items():
+            self.unbound_indexes[ptype] = self.unbound_indexes[ptype][:n].copy()
+        del self._unbound_n
+
+    def _append_unbound(self, ptype, indexes):
+        """Append indexes to the unbound buffer of ptype, doubling it when full."""
+        buf = self.unbound_indexes[ptype]
+        n0 = self._unbound_n[ptype]
+        n1 = n0 + len(indexes)
+        if n1 > len(buf):
+            newbuf = np.empty(max(2 * len(buf), n1), dtype=np.int64)
+            newbuf[:n0] = buf[:n0]
+            buf = self.unbound_indexes[ptype] = newbuf
+        buf[n0:n1] = indexes
+        self._unbound_n[ptype] = n1
 
     def _calculate_gas_quantities(self):
         """Calculate gas quantities: SFR/Metallicity/Temperature."""
@@ -349,7 +396,7 @@ class Group(object):
         if self.ngas == 0:
             return
 
-        gas_mass = self.obj.data_manager.mass[self.__glist]        
+        gas_mass = self.obj.data_manager.mass[self.global_indexes[self._is_gas]]
         gas_sfr  = self.obj.data_manager.gsfr[self.glist].d
         gas_Z    = self.obj.data_manager.gZ[self.glist].d
         gas_T    = self.obj.data_manager.gT[self.glist].d
@@ -378,7 +425,7 @@ class Group(object):
                 stellar = 0.
             else:
                 star_Z = self.obj.data_manager.sZ[self.slist].d
-                star_mass = self.obj.data_manager.mass[self.__slist]
+                star_mass = self.obj.data_manager.mass[self.global_indexes[self._is_star]]
                 star_mass_sum = np.sum(star_mass)
                 stellar = np.sum(star_Z*star_mass)/star_mass_sum
 
@@ -404,17 +451,23 @@ class Group(object):
     def _calculate_virial_quantities(self):
         """Calculates virial quantities such as r200, circular velocity, 
         and virial temperature."""
+        from caesar.group_funcs import get_virial_mr
+
         sim      = self.obj.simulation        
         critical_density = sim.critical_density   # in Msun/kpc^3 PHYSICAL
-        mass     = self.masses['total'].to('Msun')
+
+        # everything below is done in plain floats (kpc, Msun, s); units are
+        # attached once at the end
+        kpc_per_length = self._unit_factor('length', 'kpc')
+        Msun_per_mass  = self._unit_factor('mass', 'Msun')
+        mass     = self.masses['total'].d * Msun_per_mass
       
         # Mika Rafieferantsoa's virial quantity computation
-        pmass = self.obj.yt_dataset.arr(self.obj.data_manager.mass[self.global_indexes], self.obj.units['mass'])
-        pmass = pmass.to('Msun')
+        pmass = np.multiply(self.obj.data_manager.mass[self.global_indexes], Msun_per_mass, dtype=np.float64)
 
         r_sort = np.argsort(self.periodic_r.d)
         pmass = np.cumsum(pmass[r_sort])  # cumulative mass from the center of the halo
-        periodic_r = self.periodic_r.to('kpc').d[r_sort]  # sorted radii in ascending order
+        periodic_r = self.periodic_r.d[r_sort]  # sorted radii in ascending order (already kpc)
 
         #def get_r_vir(deltaC):
         #    """ returns r_vir in PHYSICAL kpc; deltaC is in units of critical density """
@@ -426,30 +479,31 @@ class Group(object):
         #self.radii['virial'] = self.obj.yt_dataset.quan(collectRadii[0], 'kpc')
         PiFac = 4./3. * np.pi
         for ir,rvname in enumerate(['200c','500c','2500c']):
-            self.radii['r'+rvname] = self.obj.yt_dataset.quan(collectRadii[ir], 'kpc')
-            self.masses['m'+rvname] = self.obj.yt_dataset.quan(collectMasses[ir], 'Msun')
+            self.radii['r'+rvname] = self.obj.yt_dataset.quan(collectRadii[ir] / kpc_per_length, self.obj.units['length'])
+            self.masses['m'+rvname] = self.obj.yt_dataset.quan(collectMasses[ir] / Msun_per_mass, self.obj.units['mass'])
         #self.masses['virial'] = 100.*critical_density * PiFac*self.radii['virial']**3
         #self.masses['m200c'] = 200.*critical_density * PiFac*self.radii['r200c']**3
         #self.masses['m500c'] = 500.*critical_density * PiFac*self.radii['r500c']**3
         #self.masses['m2500c'] = 2500.*critical_density * PiFac*self.radii['r2500c']**3
 
         #print('radii:',collectMasses,collectRadii,self.radii['r200c'],self.radii['r500c'],self.masses['m200c'],self.masses['m500c'],collectMasses[1]/self.masses['m200c'],collectMasses[2]/self.masses['m500c'])
-        # eq 1 of Mo et al 2002
-        self.radii['r200'] = (sim.G * mass / (100.0 * sim.Om_z * sim.H_z**2))**(1./3.)
+        G   = sim.G.d                 # kpc^3 / (Msun s^2)
+        H_z = sim.H_z.to('1/s').d
+
+        # eq 1 of Mo et al 2002 (kpc)
+        r200 = (G * mass / (100.0 * sim.Om_z * H_z**2))**(1./3.)
         
-        # eq 1 of Mo et al 2002
-        vc = (np.sqrt( sim.G * mass / self.radii['r200'] )).to('km/s')
+        # eq 1 of Mo et al 2002 (kpc/s, converted to obj.units['velocity'])
+        vc = np.sqrt(G * mass / r200) / self._unit_factor('velocity', 'kpc/s')
+        vc_kms = vc * self._unit_factor('velocity', 'km/s')
 
         # eq 4 of Mo et al 2002 (K)
-        vT = self.obj.yt_dataset.quan(3.6e5 * (vc.d / 100.0)**2, 'K')
+        vT = self.obj.yt_dataset.quan(3.6e5 * (vc_kms / 100.0)**2, 'K')
 
-        # convert units
+        # attach units
         #self.radii['virial'] = self.radii['virial'].to(self.obj.units['length'])
-        self.radii['r200c']  = self.radii['r200c'].to(self.obj.units['length'])
-        self.radii['r500c']  = self.radii['r500c'].to(self.obj.units['length'])
-        self.radii['r2500c']  = self.radii['r2500c'].to(self.obj.units['length'])
-        self.radii['r200']   = self.radii['r200'].to(self.obj.units['length'])        
-        vc = vc.to(self.obj.units['velocity'])
+        self.radii['r200']   = self.obj.yt_dataset.quan(r200 / kpc_per_length, self.obj.units['length'])
+        vc = self.obj.yt_dataset.quan(vc, self.obj.units['velocity'])
         vT = vT.to(self.obj.units['temperature'])
 
         self.temperatures['virial'] = vT
@@ -474,75 +528,74 @@ class Group(object):
 
     def _calculate_velocity_dispersions(self):
         """Calculate velocity dispersions for the various components."""
-        def get_sigma(filtered_v,filtered_m):
-            if len(filtered_v) == 0: return 0.0
-            mv = np.array([filtered_m[i]*filtered_v[i] for i in range(len(filtered_v))])
-            v_std = np.std(mv,axis=0)/np.mean(filtered_m)
+        def get_sigma(filtered_mv,filtered_m):
+            if len(filtered_mv) == 0: return 0.0
+            v_std = np.std(filtered_mv,axis=0)/np.mean(filtered_m)
             return np.sqrt(v_std.dot(v_std))
 
-        ptypes = self.obj.data_manager.ptype[self.global_indexes]
         v = self.obj.data_manager.vel[self.global_indexes]
         m = self.obj.data_manager.mass[self.global_indexes]
-        
-        self.velocity_dispersions['all']     = get_sigma(v,m)
-        self.velocity_dispersions['dm']      = get_sigma(v[ ptypes == ptype_ints['dm']],m[ ptypes == ptype_ints['dm']])
-        self.velocity_dispersions['baryon']  = get_sigma(v[(ptypes == ptype_ints['gas']) | (ptypes == ptype_ints['star'])],m[(ptypes == ptype_ints['gas']) | (ptypes == ptype_ints['star'])])
-        self.velocity_dispersions['gas']     = get_sigma(v[ ptypes == ptype_ints['gas']],m[ ptypes == ptype_ints['gas']])
-        self.velocity_dispersions['stellar'] = get_sigma(v[ ptypes == ptype_ints['star']],m[ ptypes == ptype_ints['star']])
+        mv = m[:,None] * v
+
+        is_dm     = self._is_dm
+        is_gas    = self._is_gas
+        is_star   = self._is_star
+        is_baryon = is_gas | is_star
+
+        self.velocity_dispersions['all']     = get_sigma(mv,m)
+        self.velocity_dispersions['dm']      = get_sigma(mv[is_dm],m[is_dm])
+        self.velocity_dispersions['baryon']  = get_sigma(mv[is_baryon],m[is_baryon])
+        self.velocity_dispersions['gas']     = get_sigma(mv[is_gas],m[is_gas])
+        self.velocity_dispersions['stellar'] = get_sigma(mv[is_star],m[is_star])
         #if np.log10(self.masses['total'])>12: print 'sigma',np.log10(self.masses['total']),self.velocity_dispersions['all'],self.velocity_dispersions['dm'],self.velocity_dispersions['gas'],self.velocity_dispersions['stellar']
         
-        for k,v in six.iteritems(self.velocity_dispersions):
+        for k,v in self.velocity_dispersions.items():
             self.velocity_dispersions[k] = self.obj.yt_dataset.quan(v, self.obj.units['velocity'])
             
     def _calculate_angular_quantities(self):
         """Calculate angular momentum, spin, max_vphi and max_vr."""
-        pos  = self.obj.yt_dataset.arr(self.obj.data_manager.pos[self.global_indexes],  self.obj.units['length'])
-        vel  = self.obj.yt_dataset.arr(self.obj.data_manager.vel[self.global_indexes],  self.obj.units['velocity'])
-        mass = self.obj.yt_dataset.arr(self.obj.data_manager.mass[self.global_indexes], self.obj.units['mass'])
-        ptype = self.obj.yt_dataset.arr(self.obj.data_manager.ptype[self.global_indexes], self.obj.units['mass'])
-
-        px = mass * vel[:,0]
-        py = mass * vel[:,1]
-        pz = mass * vel[:,2]        
-        x  = (pos[:,0] - self.pos[0]).to('km')
-        y  = (pos[:,1] - self.pos[1]).to('km')
-        z  = (pos[:,2] - self.pos[2]).to('km')
-
-        Lx = np.sum( y*pz - z*py )
-        Ly = np.sum( z*px - x*pz )
-        Lz = np.sum( x*py - y*px )
-        L  = np.sqrt(Lx**2 + Ly**2 + Lz**2)
-        
-        #self.angular_momentum        = self.obj.yt_dataset.quan(L, Lx.units)
-        self.angular_momentum_vector = self.obj.yt_dataset.arr([Lx.d,Ly.d,Lz.d], Lx.units)
+        pos  = self.obj.data_manager.pos[self.global_indexes]
+        vel  = self.obj.data_manager.vel[self.global_indexes]
+        mass = self.obj.data_manager.mass[self.global_indexes]
+
+        # work on bare arrays; only the lever arm needs converting (to km)
+        km_per_length = self._unit_factor('length', 'km')
+        L_units = 'km*%s*%s' % (self.obj.units['mass'], self.obj.units['velocity'])
+
+        L_vec = np.cross(pos - self.pos.d, mass[:,None] * vel).sum(axis=0) * km_per_length
+        Lx, Ly, Lz = L_vec
+        L  = np.sqrt(L_vec.dot(L_vec))
+
+        #self.angular_momentum        = self.obj.yt_dataset.quan(L, L_units)
+        self.angular_momentum_vector = self.obj.yt_dataset.arr(L_vec, L_units)
 
         
         # Bullock spin or lambda prime
         #self.spin = self.angular_momentum / (1.4142135623730951 *
         if self.virial_quantities['r200'] > 0:
-            self.virial_quantities['spin_param'] = self.obj.yt_dataset.quan(L, Lx.units) / (1.4142135623730951 *
+            self.virial_quantities['spin_param'] = self.obj.yt_dataset.quan(L, L_units) / (1.4142135623730951 *
                                              self.masses['total'] *
                                              self.virial_quantities['circular_velocity'].to('km/s') *
                                              self.virial_quantities['r200'].to('km'))
         else:
             self.virial_quantities['spin_param'] = self.obj.yt_dataset.quan(0.0, '')
 
-        PHI   = np.arctan2(Ly.d,Lx.d)
-        THETA = np.arccos(Lz.d/L.d)
+        PHI   = np.arctan2(Ly,Lx)
+        THETA = np.arccos(Lz/L)
         
         ex = np.sin(THETA) * np.cos(PHI)
         ey = np.sin(THETA) * np.sin(PHI)
         ez = np.cos(THETA)
 
         from caesar.utils import rotator
-        ALPHA = np.arctan2(Ly.d, Lz.d)
+        ALPHA = np.arctan2(Ly, Lz)
         p     = rotator(np.array([ex,ey,ez]), ALPHA)
         BETA  = np.arctan2(p[0],p[2])
         self.rotation_angles = dict(ALPHA=ALPHA, BETA=BETA)
 
         ## need max_vphi and max_vr
-        rotated_pos = rotator(pos.d, ALPHA, BETA)
-        rotated_vel = rotator(vel.d, ALPHA, BETA)
+        rotated_pos = rotator(pos, ALPHA, BETA)
+        rotated_vel = rotator(vel, ALPHA, BETA)
 
         r    = np.sqrt(rotated_pos[:,0]**2 + rotated_pos[:,1]**2)
         vphi = (rotated_vel[:,0] * -1. * rotated_pos[:,1] + rotated_vel[:,1] * rotated_pos[:,0]) / r
@@ -553,7 +606,7 @@ class Group(object):
             
     def _calculate_radial_quantities(self):
         """ Calculate various component radii and half radii """
-        from caesar.group_funcs import get_half_mass_radius, get_full_mass_radius
+        from caesar.group_funcs import get_half_mass_radius, get_full_mass_radius, get_periodic_r
         
         r = np.empty(len(self.global_indexes), dtype=np.float64)
         get_periodic_r(self.obj.simulation.boxsize.d, self.pos.d, self.obj.data_manager.pos[self.global_indexes], r)
@@ -572,10 +625,10 @@ class Group(object):
         )
         
         half_masses = {}
-        for k,v in six.iteritems(self.masses):
+        for k,v in self.masses.items():
             half_masses[k] = 0.5 * v            
 
-        for k,v in six.iteritems(radial_categories):
+        for k,v in radial_categories.items():
             if k == 'dm' and self.obj_type == 'galaxy': continue
             binary = 0
             for p in v:
@@ -647,7 +700,7 @@ class Group(object):
     def info(self):
         """Method to quickly print out object attributes."""
         pdict = {}
-        for k,v in six.iteritems(self.__dict__):
+        for k,v in self.__dict__.items():
             if k in info_blacklist: continue
             pdict[k] = v
         from pprint import pprint
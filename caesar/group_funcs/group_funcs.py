@@ -49,6 +49,53 @@ def get_periodic_r(
     pass
 
 
+def get_unbound(
+        boxsize,
+        G,
+        total_mass,
+        cmpos,
+        cmvel,
+        pos,
+        vel,
+        mass,
+        unbound
+):
+    """Flag particles that are not bound to their group.
+
+    A particle is unbound if its energy -m*G*(M-m)/r + 0.5*m*v^2 is
+    positive, with r the periodic distance from cmpos and v the
+    velocity relative to cmvel.  Only the sign is needed, so for
+    m > 0 and G*(M-m) > 0 this is evaluated as
+    (0.5*v^2)^2 * r^2 > (G*(M-m))^2, which avoids both the square
+    root and the division.  Massless particles are never flagged, and
+    if G*(M-m) <= 0 the energy is positive whenever the particle moves
+    or G*(M-m) < 0.
+
+    Parameters
+    ----------
+    boxsize : double
+        The size of your domain.
+    G : double
+        Gravitational constant in units consistent with the inputs.
+    total_mass : double
+        Total mass of the group.
+    cmpos : np.ndarray([x,y,z])
+        Center of mass position.
+    cmvel : np.ndarray([vx,vy,vz])
+        Center of mass velocity.
+    pos : np.ndarray
+        Nx3 numpy array containing the positions of particles.
+    vel : np.ndarray
+        Nx3 numpy array containing the velocities of particles.
+    mass : np.ndarray
+        Masses of particles.
+    unbound : np.ndarray
+        Empty uint8 array to fill with 1 (unbound) or 0 (bound).
+
+    """
+    pass
+
+
 def rotator(
         vals,
         Rx,
@@ -1,4 +1,3 @@
-import six
 import numpy as np
 cimport numpy as np
 import sys
@@ -877,13 +876,86 @@ def get_periodic_r(
 
         r[i] = sqrt(dx*dx + dy*dy + dz*dz)
         
-cdef double periodic(double x, double halfbox, double boxsize):
+cdef inline double periodic(double x, double halfbox, double boxsize) nogil:
     if x < -halfbox:
         x += boxsize
     if x > halfbox:
         x -= boxsize
     return x
 
+@cython.cdivision(True)
+@cython.wraparound(False)
+@cython.boundscheck(False)
+def get_unbound(
+        double boxsize,
+        double G,
+        double total_mass,
+        double[:] cmpos,
+        double[:] cmvel,
+        double[:,:] pos,
+        double[:,:] vel,
+        double[:] mass,
+        np.uint8_t[:] unbound
+):
+    """Flag particles that are not bound to their group.
+
+    A particle is unbound if its energy -m*G*(M-m)/r + 0.5*m*v^2 is
+    positive, with r the periodic distance from cmpos and v the
+    velocity relative to cmvel.  Only the sign is needed, so for
+    m > 0 and G*(M-m) > 0 this is evaluated as
+    (0.5*v^2)^2 * r^2 > (G*(M-m))^2, which avoids both the square
+    root and the division.  Massless particles are never flagged, and
+    if G*(M-m) <= 0 the energy is positive whenever the particle moves
+    or G*(M-m) < 0.
+
+    Parameters
+    ----------
+    boxsize : double
+        The size of your domain.
+    G : double
+        Gravitational constant in units consistent with the inputs.
+    total_mass : double
+        Total mass of the group.
+    cmpos : np.ndarray([x,y,z])
+        Center of mass position.
+    cmvel : np.ndarray([vx,vy,vz])
+        Center of mass velocity.
+    pos : np.ndarray
+        Nx3 numpy array containing the positions of particles.
+    vel : np.ndarray
+        Nx3 numpy array containing the velocities of particles.
+    mass : np.ndarray
+        Masses of particles.
+    unbound : np.ndarray
+        Empty uint8 array to fill with 1 (unbound) or 0 (bound).
+
+    """
+    cdef int i
+    cdef int n = len(unbound)
+    cdef double dx, dy, dz, dvx, dvy, dvz, r2, ekin, epot
+    cdef double halfbox = boxsize / 2.0
+
+    for i in prange(n, nogil=True, schedule='static'):
+        dx = periodic(cmpos[0] - pos[i,0], halfbox, boxsize)
+        dy = periodic(cmpos[1] - pos[i,1], halfbox, boxsize)
+        dz = periodic(cmpos[2] - pos[i,2], halfbox, boxsize)
+        r2 = dx*dx + dy*dy + dz*dz
+
+        dvx = vel[i,0] - cmvel[0]
+        dvy = vel[i,1] - cmvel[1]
+        dvz = vel[i,2] - cmvel[2]
+
+        # both terms per unit mass (m > 0 cancels); epot/r is the potential
+        ekin = 0.5 * (dvx*dvx + dvy*dvy + dvz*dvz)
+        epot = G * (total_mass - mass[i])
+        if mass[i] <= 0:
+            unbound[i] = 0
+        elif epot > 0:
+            # ekin > epot/r, squared: both sides are non-negative
+            unbound[i] = ekin*ekin*r2 > epot*epot
+        else:
+            unbound[i] = ekin > 0 or epot < 0
+
 @cython.cdivision(True)
 @cython.wraparound(False)
 @cython.boundscheck(False)
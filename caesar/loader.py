@@ -315,6 +315,16 @@ class CAESAR:
         self._ds = value
         self._ds_type = DatasetType(self._ds)
 
+    def particle_lists(self, group_type, list_name):
+        """Return the concatenated ``list_name`` (e.g. 'slist') of every
+        ``group_type`` ('halo', 'galaxy' or 'cloud'), along with the start
+        and end index of each group in it.  Each dataset is read once,
+        without constructing any groups."""
+        data = getattr(self, '_{}_data'.format(group_type))
+        lists = getattr(self, '_{}_{}'.format(group_type, list_name))
+        return (lists[:], data[list_name + '_start'][:],
+                data[list_name + '_end'][:])
+
     @property
     def central_galaxies(self):
         return [h.central_galaxy for h in self.halos]
@@ -4,7 +4,6 @@ from caesar.property_manager import DatasetType
 from caesar.particle_list import ParticleListContainer
 from caesar.simulation_attributes import SimulationAttributes
 
-import six
 from yt.funcs import mylog, get_hash
 
 
@@ -52,7 +51,7 @@ class CAESAR(object):
         )
 
         # check for unit overrides
-        for k,v in six.iteritems(kwargs):
+        for k,v in kwargs.items():
             if k.lower() in self.units:
                 self.units[k.lower()] = v
 
@@ -3,7 +3,6 @@ import numpy as np
 
 from caesar.group import Halo, Galaxy, Cloud
 from caesar.saver import blacklist
-import six
 from yt.units.yt_array import YTQuantity, YTArray, UnitRegistry
 
 LOAD_OBJECT_LISTS = True
@@ -72,13 +71,13 @@ def restore_global_attributes(obj, hd):
         Open HDF5 dataset.
 
     """
-    for k,v in six.iteritems(hd.attrs):
+    for k,v in hd.attrs.items():
         if k in blacklist: continue
         setattr(obj, k, v)
 
     if 'global_attribute_units' in hd:
         uhd = hd['global_attribute_units']
-        for k,v in six.iteritems(uhd.attrs):
+        for k,v in uhd.attrs.items():
             setattr(obj, k, YTQuantity(getattr(obj, k), v, registry=obj.unit_registry))
 
 ######################################################################
@@ -127,7 +126,7 @@ def restore_object_dicts(obj_list, hd, unit_reg):
     """
     if 'dicts' not in hd: return
     hdd = hd['dicts']
-    for k,v in six.iteritems(hdd):
+    for k,v in hdd.items():
         data = np.array(v)
 
         unit, use_quant = get_unit_quant(v, data)               
@@ -163,7 +162,7 @@ def restore_object_attributes(obj_list, hd, unit_reg):
         Unit registry.    
 
     """
-    for k,v in six.iteritems(hd):
+    for k,v in hd.items():
         if k in blacklist: continue
         if k == 'lists' or k == 'dicts': continue
         data = np.array(v)
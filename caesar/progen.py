@@ -11,6 +11,7 @@ import numpy as np
 import h5py
 import os
 import caesar
+from collections import OrderedDict
 from yt.funcs import mylog
 from caesar.utils import memlog
 from caesar.group import group_types
@@ -21,7 +22,7 @@ from scipy import stats
 # DRIVER ROUTINES #
 ###################
 
-def run_progen(snapdirs, snapname, snapnums, prefix='caesar_', suffix='hdf5', **kwargs):
+def run_progen(snapdirs, snapname, snapnums, prefix='caesar_', suffix='hdf5', comm=None, **kwargs):
     """Function to run progenitor/descendant finder in specified snapshots (or redshifts) in a given directory.
 
     Parameters
@@ -36,6 +37,12 @@ def run_progen(snapdirs, snapname, snapnums, prefix='caesar_', suffix='hdf5', **
         Prefix for caesar filename; assumes these are in 'Groups' subdir
     suffix : str
         Filetype suffix for caesar filename
+    comm : mpi4py communicator, optional
+        If given with more than one rank, pairs are handed out one at a time by
+        rank 0 to the other ranks as they become free.  Rank 0 only dispatches
+        and writes, so N ranks run N-1 pairs at once (2 ranks run serially).
+        Results are written by rank 0 once every pair is done, so no file is
+        written while another rank may be reading it.
     kwargs : Passed to progen_finder()
 
     """
@@ -80,25 +87,116 @@ def run_progen(snapdirs, snapname, snapnums, prefix='caesar_', suffix='hdf5', **
     if len(missing_snaps) > 0:
         mylog.warning('Missing snapshot/caesar file, or no halo_data for: %s'%missing)
 
+    # no rank may start writing while another is still verifying
+    if comm is not None:
+        comm.Barrier()
+
     # Collect pairs of snapshot names over which to run progen
     progen_pairs = []
     for i in range(0,len(verified_snaps)-1):
         progen_pairs.append((verified_snaps[i],verified_snaps[i+1]))
 
-    # Loop over pairs, find progens
-    for progen_pair in progen_pairs:
+    # Loop over this rank's pairs, find progens.  Consecutive pairs share a
+    # snapshot (the target of one pair is the current of the next), so keep
+    # the most recently used Caesar objects around instead of reloading them.
+    obj_cache = OrderedDict()
+    parallel = comm is not None and comm.Get_size() > 1
+    deferred = []  # (caesar_file, index_name, data, redshift) for rank 0 to write
+    for ipair in _dispatch_pairs(len(progen_pairs), comm):
+        progen_pair = progen_pairs[ipair]
         snap_current = progen_pair[0]
         snap_progens = progen_pair[1]
 
-        if snap_current.snapnum < snap_progens.snapnum: 
+        if snap_current.snapnum < snap_progens.snapnum:
             mylog.info('Progen: Finding descendants of snap %d in snap %d'%(snap_current.snapnum,snap_progens.snapnum))
         else:
             mylog.info('Progen: Finding progenitors of snap %d in snap %d'%(snap_current.snapnum,snap_progens.snapnum))
 
-        obj_current = caesar.load(caesar_filename(snap_current,prefix,suffix))
-        obj_progens = caesar.load(caesar_filename(snap_progens,prefix,suffix))
+        obj_current = _load_cached(snap_current.outfile, obj_cache)
+        obj_progens = _load_cached(snap_progens.outfile, obj_cache)
+
+        if not parallel or not kwargs.get('overwrite', True):
+            progen_finder(obj_current, obj_progens, snap_current.outfile, **kwargs)
+            continue
+
+        # another rank may have this file open as its target, so leave the
+        # writing to rank 0 once all pairs are done
+        finder_kwargs = {k: v for k, v in kwargs.items() if k != 'overwrite'}
+        prog_indexes = _compute_progens(obj_current, obj_progens, **finder_kwargs)
+        if prog_indexes is not None:
+            index_name = _progen_index_name(obj_current, obj_progens,
+                                            finder_kwargs.get('data_type', 'galaxy'),
+                                            finder_kwargs.get('part_type', 'star'))
+            deferred.append((snap_current.outfile, index_name, np.array(prog_indexes).T,
+                             obj_progens.simulation.redshift))
+
+    if parallel:
+        deferred = comm.gather(deferred, root=0)
+        if comm.Get_rank() == 0:
+            for rank_deferred in deferred:
+                for caesar_file, index_name, data, redshift in rank_deferred:
+                    write_progens(None, data, caesar_file, index_name, redshift)
+        comm.Barrier()
+
+
+def _load_cached(outfile, cache, maxsize=3):
+    """Return caesar.load(outfile), reusing objects held in cache.
+
+    cache is an OrderedDict keyed by absolute filename and kept in order of
+    use; once it holds more than maxsize objects the least recently used is
+    dropped.  Loaded objects only open their HDF5 file while reading, so
+    dropping the reference is all that is needed to release one.
+
+    """
+    outfile = os.path.abspath(outfile)
+    if outfile in cache:
+        cache.move_to_end(outfile)
+    else:
+        cache[outfile] = caesar.load(outfile)
+        while len(cache) > maxsize:
+            cache.popitem(last=False)
+    return cache[outfile]
+
+
+def _dispatch_pairs(npairs, comm=None):
+    """Generator yielding the indexes of the progen pairs this rank should run.
 
-        progen_finder(obj_current, obj_progens, caesar_filename(snap_current,prefix,suffix), **kwargs)
+    Without a communicator (or with a single rank) every pair is yielded in
+    order.  Otherwise rank 0 acts as a dispatcher, handing out one pair at a time
+    to whichever rank asks next; progen cost scales with the number of groups,
+    which varies strongly with redshift, so a fixed stride leaves ranks idle.
+    Rank 0 does not run any pairs itself.
+
+    """
+    if comm is None or comm.Get_size() == 1:
+        for ipair in range(npairs):
+            yield ipair
+        return
+
+    from mpi4py import MPI
+    READY, WORK = 1, 2
+
+    if comm.Get_rank() == 0:
+        status = MPI.Status()
+        nworkers = comm.Get_size() - 1
+        next_pair = 0
+        while nworkers > 0:
+            comm.recv(source=MPI.ANY_SOURCE, tag=READY, status=status)
+            if next_pair < npairs:
+                comm.send(next_pair, dest=status.Get_source(), tag=WORK)
+                next_pair += 1
+            else:
+                comm.send(-1, dest=status.Get_source(), tag=WORK)  # no work left
+                nworkers -= 1
+    else:
+        while True:
+            comm.send(None, dest=0, tag=READY)
+            ipair = comm.recv(source=0, tag=WORK)
+            if ipair < 0:
+                break
+            yield ipair
+
+    comm.Barrier()
 
 
 def progen_finder(obj_current, obj_target, caesar_file, snap_dir=None, data_type='galaxy', part_type='star', overwrite=True, n_most=1, min_in_common=0.1, nproc=1):
@@ -134,10 +232,7 @@ def progen_finder(obj_current, obj_target, caesar_file, snap_dir=None, data_type
 
     """
 
-    if obj_current.simulation.redshift > obj_target.simulation.redshift:
-        index_name = 'descend_'+data_type+'_'+part_type
-    else:
-        index_name = 'progen_'+data_type+'_'+part_type
+    index_name = _progen_index_name(obj_current, obj_target, data_type, part_type)
 
     if not overwrite:
         if check_if_progen_is_present(caesar_file, index_name):
@@ -148,21 +243,36 @@ def progen_finder(obj_current, obj_target, caesar_file, snap_dir=None, data_type
         else:
             mylog.warning('Computing and returning progen indexes, but NOT storing in Caesar file!')
 
-    ng_current, pid_current, gid_current, pid_hash = collect_group_IDs(obj_current, data_type, part_type, snap_dir)
-    ng_target, pid_target, gid_target, _ = collect_group_IDs(obj_target, data_type, part_type, snap_dir)
-
-    if ng_current == 0 or ng_target == 0:
-        mylog.warning('No %s found in current caesar/target file (%d/%d) -- exiting progen_finder'%(data_type,ng_current,ng_target))
+    prog_indexes = _compute_progens(obj_current, obj_target, snap_dir=snap_dir, data_type=data_type, part_type=part_type, n_most=n_most, min_in_common=min_in_common, nproc=nproc)
+    if prog_indexes is None:
         return
 
-    prog_indexes = find_progens(pid_current, pid_target, gid_current, gid_target, pid_hash, n_most=n_most, min_in_common=min_in_common, nproc=nproc)
-
     if overwrite:
         write_progens(obj_current, np.array(prog_indexes).T, caesar_file, index_name, obj_target.simulation.redshift)
 
     return prog_indexes
 
 
+def _progen_index_name(obj_current, obj_target, data_type, part_type):
+    """Name of the tree_data dataset holding progens (or descendants) of obj_current in obj_target."""
+    if obj_current.simulation.redshift > obj_target.simulation.redshift:
+        return 'descend_'+data_type+'_'+part_type
+    return 'progen_'+data_type+'_'+part_type
+
+
+def _compute_progens(obj_current, obj_target, snap_dir=None, data_type='galaxy', part_type='star', n_most=1, min_in_common=0.1, nproc=1):
+    """Collect group particle IDs and run find_progens(), without writing anything.
+    Returns None if either object has no groups of data_type."""
+    ng_current, pid_current, gid_current, pid_hash = collect_group_IDs(obj_current, data_type, part_type, snap_dir)
+    ng_target, pid_target, gid_target, _ = collect_group_IDs(obj_target, data_type, part_type, snap_dir)
+
+    if ng_current == 0 or ng_target == 0:
+        mylog.warning('No %s found in current caesar/target file (%d/%d) -- exiting progen_finder'%(data_type,ng_current,ng_target))
+        return None
+
+    return find_progens(pid_current, pid_target, gid_current, gid_target, pid_hash, n_most=n_most, min_in_common=min_in_common, nproc=nproc)
+
+
 def find_progens(pid_current, pid_target, gid_current, gid_target, pid_hash, n_most=1, min_in_common=0.1, nproc=1):
     """Find most massive and second most massive progenitor/descendants.
     
@@ -263,33 +373,32 @@ def collect_group_IDs(obj, data_type, part_type, snap_dir):
     all_pids = np.array(readsnap(snapfile,'pid',part_type,suppress=1),dtype=np.uint64)
 
     from caesar.fubar_halo import plist_dict
-    if data_type == 'halo':
-        part_list = 'obj.halos[i].%s'%plist_dict[part_type]
-        ngroups = len(obj.halos)
-    elif data_type == 'galaxy':
-        part_list = 'obj.galaxies[i].%s'%plist_dict[part_type]
-        ngroups = len(obj.galaxies)
-    elif data_type == 'cloud':
-        part_list = 'obj.clouds[i].%s'%plist_dict[part_type]
-        ngroups = len(obj.clouds)
-
-    # count number of total particles in groups
-    npart = 0
-    for i in range(ngroups):
-        mylist = eval(part_list)
-        npart += len(mylist)
+    plist = plist_dict[part_type]
+    groups = getattr(obj, group_types[data_type])
+    ngroups = len(groups)
+
+    # gather the concatenated particle list, with each group's start and length in it
+    if ngroups == 0:
+        starts = lengths = np.zeros(0, dtype=np.int64)
+        lists = np.zeros(0, dtype=np.int64)
+    elif hasattr(obj, 'particle_lists'):
+        # lazily-loaded object: read the list dataset and its offsets once,
+        # rather than constructing every group just to slice out its list
+        lists, starts, ends = obj.particle_lists(data_type, plist)
+        starts = np.asarray(starts, dtype=np.int64)
+        lengths = np.asarray(ends, dtype=np.int64) - starts
+    else:
+        mylists = [getattr(group, plist) for group in groups]
+        lengths = np.array([len(mylist) for mylist in mylists], dtype=np.int64)
+        starts = np.cumsum(lengths) - lengths
+        lists = np.concatenate(mylists)
 
     # fill particle and group ID lists
-    pids = np.zeros(npart,dtype=np.int64)
-    gids = np.zeros(npart,dtype=np.int32)
-    pid_hash = np.zeros(ngroups,dtype=np.int64)
-    count = 0
-    for i in range(ngroups):
-        mylist = eval(part_list)
-        pids[count:count+len(mylist)] = all_pids[mylist]
-        gids[count:count+len(mylist)] = np.full(len(mylist),i)
-        pid_hash[i] = count
-        count += len(mylist)
+    npart = int(np.sum(lengths))
+    pid_hash = np.cumsum(lengths) - lengths
+    index = np.repeat(starts - pid_hash, lengths) + np.arange(npart, dtype=np.int64)
+    pids = all_pids[np.asarray(lists, dtype=np.int64)[index]].astype(np.int64)
+    gids = np.repeat(np.arange(ngroups, dtype=np.int32), lengths)
     pid_hash = np.append(pid_hash,npart+1)
 
     return ngroups, pids, gids, pid_hash
@@ -1,4 +1,3 @@
-import six
 import numpy as np
 cimport numpy as np
 import sys
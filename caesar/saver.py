@@ -2,7 +2,6 @@ import os
 import h5py
 import numpy as np
 import pdb
-import six
 from yt.units.yt_array import YTQuantity, YTArray
 from yt import mylog
 blacklist = [
@@ -84,7 +83,7 @@ def serialize_attributes(obj_list, hd, hd_dicts):
         Open HDF5 group for dictionaries.
 
     """
-    for k,v in six.iteritems(obj_list[0].__dict__):
+    for k,v in obj_list[0].__dict__.items():
         if k in blacklist: continue
 
         if isinstance(v, dict):
@@ -123,7 +122,7 @@ def _write_attrib(obj_list, k, v, hd):
         hd[k].attrs.create('unit', str(v.units).encode('utf8'))
             
 def _write_dict(obj_list, k, v, hd):
-    for kk,vv in six.iteritems(v):
+    for kk,vv in v.items():
         unit = False        
         if isinstance(vv, (YTQuantity, YTArray)):
             data = np.array([getattr(i,k)[kk].d for i in obj_list])
@@ -150,7 +149,7 @@ def serialize_global_attribs(obj, hd):
 
     """
     units = {}
-    for k,v in six.iteritems(obj.__dict__):
+    for k,v in obj.__dict__.items():
         if k in blacklist: continue
 
         if isinstance(v, (YTQuantity, YTArray)):
@@ -165,7 +164,7 @@ def serialize_global_attribs(obj, hd):
 
     if len(units) > 0:
         uhd = hd.create_group('global_attribute_units')
-        for k,v in six.iteritems(units):
+        for k,v in units.items():
             uhd.attrs.create(k, str(v).encode('utf8'))
             
 ######################################################################
@@ -86,13 +86,12 @@ class SimulationAttributes(object):
 
         
     def _serialize(self, obj, hd):
-        import  six
         from yt.units.yt_array import YTArray
 
         hdd  = hd.create_group('simulation_attributes')
         
         units = {}        
-        for k,v in six.iteritems(self.__dict__):
+        for k,v in self.__dict__.items():
             if isinstance(v, YTArray):
                 hdd.attrs.create(k, v.d)
                 units[k] = v.units
@@ -102,29 +101,28 @@ class SimulationAttributes(object):
                 hdd.attrs.create(k, v.encode('utf8'))
                 
         uhdd = hdd.create_group('units')               
-        for k,v in six.iteritems(units):
+        for k,v in units.items():
             uhdd.attrs.create(k, str(v).encode('utf8'))
             
         phdd = hdd.create_group('parameters')
-        for k,v in six.iteritems(self.parameters):
+        for k,v in self.parameters.items():
             phdd.attrs.create(k, v)
 
             
     def _unpack(self, obj, hd):
-        import six
         if 'simulation_attributes' not in hd.keys():
             return
         from yt.units.yt_array import YTArray
         
         hdd = hd['simulation_attributes']
-        for k,v in six.iteritems(hdd.attrs):
+        for k,v in hdd.attrs.items():
             setattr(self, k, v)
 
         uhdd = hdd['units']
-        for k,v in six.iteritems(uhdd.attrs):
+        for k,v in uhdd.attrs.items():
             setattr(self, k, YTArray(getattr(self, k), v, registry=obj.unit_registry))
 
         phdd = hdd['parameters']
         self.parameters = {}
-        for k,v in six.iteritems(phdd.attrs):
+        for k,v in phdd.attrs.items():
             self.parameters[k] = v
@@ -0,0 +1,201 @@
+#=======================================================================
+# Run Group._process_group on a small synthetic halo and check the
+# results against direct numpy calculations
+#=======================================================================
+
+import types
+
+import numpy as np
+import pytest
+
+pytest.importorskip('caesar.group_funcs')
+
+from yt.units.yt_array import YTArray, YTQuantity
+from caesar.property_manager import ptype_ints
+from caesar.simulation_attributes import SimulationAttributes
+
+BOXSIZE = 10000.  # kpc
+G = 4.51691362044e-39  # kpc^3 / (Msun s^2)
+KPC_PER_KM = 3.240779289666e-17
+
+
+class FakeDataset(object):
+    def arr(self, value, units):
+        return YTArray(value, units)
+
+    def quan(self, value, units):
+        return YTQuantity(value, units)
+
+
+def make_halo_obj(center=(5000., 5000., 5000.), ngas=60, nstar=40, ndm=200,
+                  nfast=5, seed=42, unbind=True):
+    """Build a minimal obj/data_manager pair holding a single halo.
+
+    Particles are a virialised-ish clump around ``center`` plus ``nfast``
+    DM particles moving fast enough to be unbound.  Units are kpc, Msun
+    and km/s throughout.
+    """
+    rng = np.random.default_rng(seed)
+    npart = ngas + nstar + ndm + nfast
+    ptype = np.concatenate([
+        np.full(ngas, ptype_ints['gas']),
+        np.full(nstar, ptype_ints['star']),
+        np.full(ndm + nfast, ptype_ints['dm']),
+    ]).astype(np.int32)
+    indexes = np.concatenate([
+        np.arange(ngas), np.arange(nstar), np.arange(ndm + nfast),
+    ]).astype(np.int64)
+
+    pos = (np.asarray(center) + rng.normal(0., 30., (npart, 3))) % BOXSIZE
+    vel = rng.normal(0., 40., (npart, 3))
+    vel[-nfast:] += 5000.
+    mass = rng.uniform(1e9, 3e9, npart)
+    pot = rng.uniform(-1., 0., npart)
+
+    dm = types.SimpleNamespace(
+        ptype=ptype, indexes=indexes, index=indexes,
+        pos=pos, vel=vel, mass=mass, pot=pot,
+        gsfr=YTArray(rng.uniform(0., 1., ngas), 'Msun/yr'),
+        gZ=YTArray(rng.uniform(0., 0.02, ngas), ''),
+        gT=YTArray(rng.uniform(1e4, 1e6, ngas), 'K'),
+        sZ=YTArray(rng.uniform(0., 0.02, nstar), ''),
+        blackholes=False, use_bhmass=False,
+        glist=np.where(ptype == ptype_ints['gas'])[0],
+        slist=np.where(ptype == ptype_ints['star'])[0],
+        dmlist=np.where(ptype == ptype_ints['dm'])[0],
+    )
+
+    sim = SimulationAttributes()
+    sim.boxsize = YTQuantity(BOXSIZE, 'kpc')
+    sim.G = YTQuantity(G, 'kpc**3/(Msun*s**2)')
+    sim.H_z = YTQuantity(2.3e-18, '1/s')
+    sim.Om_z = 0.3
+    sim.XH = 0.76
+    sim.nbh = 0
+    sim.ndust = 0
+    sim.critical_density = YTQuantity(3.0 * sim.H_z.d**2 / (8.0 * np.pi * G), 'Msun/kpc**3')
+    sim.Densities = YTArray(np.array([200., 500., 2500.]) * sim.critical_density.d, 'Msun/kpc**3')
+    sim.unbind_halos = unbind
+    sim.unbind_galaxies = unbind
+
+    obj = types.SimpleNamespace(
+        data_manager=dm, simulation=sim, yt_dataset=FakeDataset(),
+        units=dict(length='kpc', mass='Msun', velocity='km/s',
+                   temperature='K', time='yr'),
+    )
+    return obj
+
+
+def process_halo(obj, global_indexes=None):
+    from caesar.group import Halo
+    halo = Halo(obj)
+    if global_indexes is None:
+        global_indexes = np.arange(len(obj.data_manager.ptype), dtype=np.int64)
+    halo.global_indexes = global_indexes
+    halo._process_group()
+    return halo
+
+
+def reference_unbind(obj):
+    """Plain numpy version of the unbinding loop: returns the global
+    indexes that stay bound."""
+    dm = obj.data_manager
+    kms = 1. / KPC_PER_KM
+    gidx = np.arange(len(dm.ptype))
+    while True:
+        m = dm.mass[gidx]
+        cmpos = np.average(dm.pos[gidx], axis=0, weights=m)
+        cmvel = np.average(dm.vel[gidx], axis=0, weights=m)
+        dx = dm.pos[gidx] - cmpos
+        dx = (dx + 0.5 * BOXSIZE) % BOXSIZE - 0.5 * BOXSIZE
+        r = np.sqrt((dx**2).sum(axis=1))
+        v2 = (((dm.vel[gidx] - cmvel) / kms)**2).sum(axis=1)
+        energy = -(m * G * (m.sum() - m) / r) + 0.5 * m * v2
+        if not np.any(energy > 0):
+            return gidx
+        gidx = gidx[energy <= 0]
+
+
+def test_process_group_masses_and_center():
+    obj = make_halo_obj(unbind=False)
+    halo = process_halo(obj)
+    dm = obj.data_manager
+
+    assert halo.ngas == 60 and halo.nstar == 40 and halo.ndm == 205
+    assert halo.masses['total'].d == pytest.approx(dm.mass.sum())
+    assert halo.masses['gas'].d == pytest.approx(dm.mass[dm.glist].sum())
+    assert halo.masses['stellar'].d == pytest.approx(dm.mass[dm.slist].sum())
+    assert halo.masses['dm'].d == pytest.approx(dm.mass[dm.dmlist].sum())
+    np.testing.assert_allclose(halo.pos.d, np.average(dm.pos, axis=0, weights=dm.mass))
+    np.testing.assert_allclose(halo.vel.d, np.average(dm.vel, axis=0, weights=dm.mass))
+
+    L = np.cross(dm.pos - halo.pos.d, dm.mass[:, None] * dm.vel).sum(axis=0) / KPC_PER_KM
+    np.testing.assert_allclose(halo.angular_momentum_vector.d, L)
+
+    r200 = (G * dm.mass.sum() / (100.0 * 0.3 * 2.3e-18**2))**(1. / 3.)
+    assert halo.radii['r200'].d == pytest.approx(r200)
+    vc = np.sqrt(G * dm.mass.sum() / r200) / KPC_PER_KM
+    assert halo.virial_quantities['circular_velocity'].d == pytest.approx(vc)
+
+
+def test_process_group_mass_weighted_quantities():
+    obj = make_halo_obj(unbind=False)
+    dm = obj.data_manager
+    # reversed, so a particle's position in the group differs from its global index
+    halo = process_halo(obj, np.arange(len(dm.ptype), dtype=np.int64)[::-1].copy())
+
+    gmass = dm.mass[dm.glist]
+    smass = dm.mass[dm.slist]
+    assert halo.temperatures['mass_weighted'].d == pytest.approx(np.average(dm.gT.d, weights=gmass))
+    assert halo.metallicities['mass_weighted'].d == pytest.approx(np.average(dm.gZ.d, weights=gmass))
+    assert halo.metallicities['stellar'].d == pytest.approx(np.average(dm.sZ.d, weights=smass))
+
+
+def test_process_group_across_periodic_boundary():
+    inside = process_halo(make_halo_obj(unbind=False))
+    wrapped = process_halo(make_halo_obj(center=(5., 5000., 9995.), unbind=False))
+
+    np.testing.assert_allclose(wrapped.pos.d[1], inside.pos.d[1])
+    assert 0. <= wrapped.pos.d[0] < BOXSIZE and 0. <= wrapped.pos.d[2] < BOXSIZE
+    assert min(wrapped.pos.d[0], BOXSIZE - wrapped.pos.d[0]) < 20.
+    assert min(wrapped.pos.d[2], BOXSIZE - wrapped.pos.d[2]) < 20.
+    for k in ('r200c', 'r500c', 'r200'):
+        assert wrapped.radii[k].d == pytest.approx(inside.radii[k].d, rel=1e-6)
+
+
+def test_process_group_unbind():
+    obj = make_halo_obj()
+    halo = process_halo(obj)
+    dm = obj.data_manager
+
+    bound = reference_unbind(obj)
+    assert len(bound) < len(dm.ptype)
+    assert halo.masses['total'].d == pytest.approx(dm.mass[bound].sum())
+    unbound = np.setdiff1d(np.arange(len(dm.ptype)), bound)
+    for ptype, unbound_indexes in halo.unbound_indexes.items():
+        expected = dm.indexes[unbound[dm.ptype[unbound] == ptype]]
+        np.testing.assert_array_equal(np.sort(unbound_indexes), np.sort(expected))
+    np.testing.assert_array_equal(np.sort(halo.dmlist), np.sort(dm.indexes[bound[dm.ptype[bound] == ptype_ints['dm']]]))
+
+
+def test_unbind_twice():
+    obj = make_halo_obj()
+    from caesar.group import Halo
+    halo = Halo(obj)
+    halo.global_indexes = np.arange(len(obj.data_manager.ptype), dtype=np.int64)
+    halo._assign_local_data()
+    halo._calculate_total_mass()
+    halo._calculate_center_of_mass_quantities()
+
+    halo._unbind()
+    first = {k: v.copy() for k, v in halo.unbound_indexes.items()}
+    assert sum(len(v) for v in first.values()) == len(obj.data_manager.ptype) - len(halo.global_indexes)
+
+    # fast particles that join later are appended after the earlier ones
+    obj.data_manager.vel[halo.global_indexes[:3]] += 5000.
+    halo._unbind()
+    assert sum(len(v) for v in halo.unbound_indexes.values()) > sum(len(v) for v in first.values())
+    for ptype, unbound in halo.unbound_indexes.items():
+        np.testing.assert_array_equal(unbound[:len(first[ptype])], first[ptype])
+    assert sum(len(v) for v in halo.unbound_indexes.values()) == len(obj.data_manager.ptype) - len(halo.global_indexes)
+    assert not hasattr(halo, '_unbound_n')
@@ -0,0 +1,73 @@
+#=======================================================================
+# Compare the compiled group_funcs kernels with plain numpy versions
+#=======================================================================
+
+import numpy as np
+import pytest
+
+group_funcs = pytest.importorskip('caesar.group_funcs')
+
+
+def numpy_energy(boxsize, G, total_mass, cmpos, cmvel, pos, vel, mass):
+    """The binding energy as _unbind used to compute it."""
+    r = np.empty(len(pos), dtype=np.float64)
+    group_funcs.get_periodic_r(boxsize, cmpos, pos, r)
+    v2 = ((vel - cmvel)**2).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return -(mass * G * (total_mass - mass) / r) + (0.5 * mass * v2)
+
+
+def run_get_unbound(boxsize, G, total_mass, cmpos, cmvel, pos, vel, mass):
+    unbound = np.empty(len(pos), dtype=np.uint8)
+    group_funcs.get_unbound(boxsize, G, total_mass, cmpos, cmvel, pos, vel, mass, unbound)
+    return unbound.astype(bool)
+
+
+def random_group(center, n=2000, boxsize=1000., seed=1):
+    rng = np.random.default_rng(seed)
+    pos = (np.asarray(center) + rng.normal(0., 20., (n, 3))) % boxsize
+    vel = rng.normal(0., 1.0, (n, 3))
+    mass = rng.uniform(0.5, 1.5, n)
+    return pos, vel, mass
+
+
+@pytest.mark.parametrize('center', [(500., 500., 500.), (2., 998., 500.)])
+def test_get_unbound_matches_energy(center):
+    boxsize, G = 1000., 1.0
+    pos, vel, mass = random_group(center, boxsize=boxsize)
+    cmvel = np.zeros(3)
+    # choose G*M so that a good fraction of particles is unbound
+    total_mass = 0.5 * mass.sum() / len(mass) * 40.
+
+    energy = numpy_energy(boxsize, G, total_mass, np.asarray(center, dtype=np.float64), cmvel, pos, vel, mass)
+    unbound = run_get_unbound(boxsize, G, total_mass, np.asarray(center, dtype=np.float64), cmvel, pos, vel, mass)
+
+    assert 0 < unbound.sum() < len(unbound)
+    np.testing.assert_array_equal(unbound, energy > 0)
+
+
+def test_get_unbound_wraps_across_boundary():
+    boxsize, G = 1000., 1.0
+    # identical groups, one straddling the corner of the box
+    pos, vel, mass = random_group((500., 500., 500.), boxsize=boxsize)
+    shift = np.array([-499., 499., -499.])
+    wrapped = (pos + shift) % boxsize
+    total_mass = 20. * mass.mean()
+
+    inside = run_get_unbound(boxsize, G, total_mass, np.array([500., 500., 500.]), np.zeros(3), pos, vel, mass)
+    across = run_get_unbound(boxsize, G, total_mass, np.array([1., 999., 1.]), np.zeros(3), wrapped, vel, mass)
+    np.testing.assert_array_equal(inside, across)
+
+
+def test_get_unbound_edge_cases():
+    boxsize, G = 1000., 1.0
+    cmpos, cmvel = np.zeros(3), np.zeros(3)
+    pos = np.array([[1., 0., 0.], [1., 0., 0.], [0., 0., 0.], [1., 0., 0.], [1., 0., 0.]])
+    vel = np.array([[0., 0., 0.], [5., 0., 0.], [5., 0., 0.], [5., 0., 0.], [0., 0., 0.]])
+    # massless, fast, at the centre, and two with G*(M-m) <= 0
+    mass = np.array([0., 1., 1., 3., 2.])
+    total_mass = 2.
+
+    energy = numpy_energy(boxsize, G, total_mass, cmpos, cmvel, pos, vel, mass)
+    unbound = run_get_unbound(boxsize, G, total_mass, cmpos, cmvel, pos, vel, mass)
+    np.testing.assert_array_equal(unbound, energy > 0)
@@ -0,0 +1,92 @@
+#=======================================================================
+# Check progen's collection of group particle IDs against slicing each
+# group's particle list directly
+#=======================================================================
+
+import sys
+import types
+
+import numpy as np
+import pytest
+
+pytest.importorskip('caesar.fubar_halo')
+
+from caesar.loader import CAESAR
+from caesar.progen import collect_group_IDs
+
+ALL_PIDS = np.arange(1000, 1100, dtype=np.uint64)
+
+
+@pytest.fixture(autouse=True)
+def fake_readsnap(monkeypatch):
+    """collect_group_IDs reads particle IDs from the snapshot; hand it ALL_PIDS."""
+    readgadget = types.ModuleType('readgadget')
+    readgadget.readsnap = lambda snapfile, block, ptype, suppress=0: ALL_PIDS
+    monkeypatch.setitem(sys.modules, 'readgadget', readgadget)
+
+
+def fake_simulation():
+    return types.SimpleNamespace(fullpath=b'/nowhere', basename=b'snap_000.hdf5')
+
+
+def lazy_obj(slist, starts, ends):
+    """A loader.CAESAR holding only the galaxy star lists, as arrays."""
+    obj = CAESAR.__new__(CAESAR)
+    obj.simulation = fake_simulation()
+    obj._galaxy_data = {'slist_start': np.asarray(starts), 'slist_end': np.asarray(ends)}
+    obj._galaxy_slist = np.asarray(slist)
+    obj.ngalaxies = len(starts)
+    obj.galaxies = [None] * len(starts)
+    return obj
+
+
+def eager_obj(slist, starts, ends):
+    """An object whose galaxies carry their own slist, like old_load gives."""
+    galaxies = [types.SimpleNamespace(slist=np.asarray(slist)[s:e]) for s, e in zip(starts, ends)]
+    return types.SimpleNamespace(simulation=fake_simulation(), galaxies=galaxies)
+
+
+def reference(slist, starts, ends):
+    """The per-group loop collect_group_IDs used to run."""
+    slist = np.asarray(slist)
+    pids, gids, pid_hash = [], [], []
+    for i, (s, e) in enumerate(zip(starts, ends)):
+        pid_hash.append(len(pids))
+        pids.extend(ALL_PIDS[slist[s:e]])
+        gids.extend([i] * (e - s))
+    pid_hash.append(len(pids) + 1)
+    return len(starts), np.array(pids, dtype=np.int64), np.array(gids, dtype=np.int32), np.array(pid_hash)
+
+
+CASES = {
+    # contiguous, with an empty group in the middle
+    'contiguous': ([5, 3, 9, 7, 1, 2, 60], [0, 3, 3, 6], [3, 3, 6, 7]),
+    # groups stored out of order and with gaps in the list dataset
+    'scattered': ([11, 12, 13, 14, 15, 16, 17, 18, 19], [6, 0, 4, 4], [9, 2, 6, 4]),
+    'no groups': ([], [], []),
+}
+
+
+@pytest.mark.parametrize('make_obj', [lazy_obj, eager_obj])
+@pytest.mark.parametrize('case', sorted(CASES))
+def test_collect_group_IDs(make_obj, case):
+    slist, starts, ends = CASES[case]
+    obj = make_obj(np.array(slist, dtype=np.int64), np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64))
+
+    ngroups, pids, gids, pid_hash = collect_group_IDs(obj, 'galaxy', 'star', None)
+    ref_ngroups, ref_pids, ref_gids, ref_pid_hash = reference(slist, starts, ends)
+
+    assert ngroups == ref_ngroups
+    np.testing.assert_array_equal(pids, ref_pids)
+    np.testing.assert_array_equal(gids, ref_gids)
+    np.testing.assert_array_equal(pid_hash, ref_pid_hash)
+    assert pids.dtype == np.int64 and gids.dtype == np.int32
+
+
+def test_particle_lists():
+    slist, starts, ends = CASES['scattered']
+    obj = lazy_obj(slist, starts, ends)
+    lists, s, e = obj.particle_lists('galaxy', 'slist')
+    np.testing.assert_array_equal(lists, slist)
+    np.testing.assert_array_equal(s, starts)
+    np.testing.assert_array_equal(e, ends)